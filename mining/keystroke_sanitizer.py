@@ -1,8 +1,9 @@
 
 import os
+import re
 import json
-import glob
 from datetime import datetime
+from operator import itemgetter
 from typing import Dict, List, Tuple, Any, Optional
 
 from utils.keepass_manager import KeePassManager
@@ -15,6 +16,10 @@ class KeystrokeSanitizer:
     def __init__(self, password=None, keyfile=None, logs_dir="logs/sanitized_json"):
         self.logs_dir = logs_dir
         self.password_manager = KeePassManager.get_instance()
+        self._manager_passwords = []
+        self._manager_passwords_version = None
+        self._prepared_passwords = None
+        self._prepared_passwords_key = None
         
         if password:
             self.setup_encryption(password, keyfile)
@@ -43,8 +48,8 @@ class KeystrokeSanitizer:
         if not password_locations or not text:
             return text
         
-        sorted_locations = sorted(password_locations, key=lambda x: x[0])
-        result = ""
+        sorted_locations = sorted(password_locations, key=itemgetter(0))
+        parts = []
         last_end = 0
         
         for start, end in sorted_locations:
@@ -52,109 +57,109 @@ class KeystrokeSanitizer:
                 continue
                 
             if start > last_end:
-                result += text[last_end:start]
-            result += "[REDACTED]"
+                parts.append(text[last_end:start])
+            parts.append("[REDACTED]")
             last_end = end
             
         if last_end < len(text):
-            result += text[last_end:]
+            parts.append(text[last_end:])
             
-        return result
+        return "".join(parts)
+    
+    def _current_passwords(self) -> List[str]:
+        version = self.password_manager.version
+        if version != self._manager_passwords_version:
+            self._manager_passwords = self.password_manager.get_passwords()
+            self._manager_passwords_version = version
+        return self._manager_passwords
     
-    def _detect_passwords(self, text: str, buffer_states: List[str]) -> List[Tuple[int, int, int]]:
-        passwords = self.password_manager.get_passwords()
+    def _prepare_passwords(self, passwords: List[str]):
+        key = tuple(passwords)
+        if key != self._prepared_passwords_key:
+            passwords_lower = [(password.lower(), len(password)) for password in passwords]
+            any_password = re.compile("|".join(re.escape(password_lower) for password_lower, _ in passwords_lower))
+            self._prepared_passwords = (any_password, passwords_lower)
+            self._prepared_passwords_key = key
+        return self._prepared_passwords
+    
+    def _detect_passwords(self, text: str, buffer_states: List[str], passwords: Optional[List[str]] = None) -> List[Tuple[int, int, int]]:
+        if passwords is None:
+            passwords = self._current_passwords()
         if not passwords or (not text and not buffer_states):
             return []
         
-        all_locations = []
+        unique_locations = []
+        seen_positions = set()
         if text:
-            matches = FuzzyMatcher.find_matches(text, passwords)
-            for match in matches:
-                all_locations.append((match.start, match.end, -1))
+            for match in FuzzyMatcher.find_matches(text, passwords):
+                unique_locations.append((match.start, match.end, -1))
+                seen_positions.add((match.start, match.end))
+        
+        buffer_locations = []
+        # One pass per state rejects the states that contain no password at all
+        any_password, passwords_lower = self._prepare_passwords(passwords)
+        # A repeated state can only produce positions already found for its first occurrence
+        seen_states = set()
         for buffer_idx, state in enumerate(buffer_states):
-            if not state:
+            if not state or state in seen_states:
                 continue
+            seen_states.add(state)
                 
-            for password in passwords:
-                password_lower = password.lower()
-                if password_lower in state.lower():
-                    start_idx = state.lower().find(password_lower)
-                    end_idx = start_idx + len(password)
-                    all_locations.append((start_idx, end_idx, buffer_idx))
-        
-        unique_locations = []
-        seen_positions = set()
-        for start, end, buffer_idx in sorted(all_locations, key=lambda x: (x[2] != -1, x[0])):
-            pos_key = (start, end)
-            if pos_key not in seen_positions:
-                unique_locations.append((start, end, buffer_idx))
-                seen_positions.add(pos_key)
+            state_lower = state.lower()
+            if not any_password.search(state_lower):
+                continue
+                
+            for password_lower, password_len in passwords_lower:
+                start_idx = state_lower.find(password_lower)
+                if start_idx != -1:
+                    pos_key = (start_idx, start_idx + password_len)
+                    if pos_key not in seen_positions:
+                        buffer_locations.append((start_idx, start_idx + password_len, buffer_idx))
+                        seen_positions.add(pos_key)
         
+        buffer_locations.sort(key=itemgetter(0))
+        unique_locations.extend(buffer_locations)
         return unique_locations
 
-    def process_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def process_events(self, events: List[Dict[str, Any]], passwords: Optional[List[str]] = None) -> Dict[str, Any]:
         extracted_text, buffer_states, position_to_event_ids, related_events, buffer_state_mappings = TextBuffer.events_to_text(events)
         
-        password_locations = self._detect_passwords(extracted_text, buffer_states)
+        password_locations = self._detect_passwords(extracted_text, buffer_states, passwords)
         
         events_to_remove = set()
         
         for start, end, buffer_idx in password_locations:
             if buffer_idx == -1:
-                for pos in range(start, end):
-                    pos_str = str(pos)
-                    if pos_str in position_to_event_ids:
-                        for event_id_str in position_to_event_ids[pos_str]:
-                            event_id = int(event_id_str)
-                            events_to_remove.add(event_id)
-                            
-                            if event_id in related_events:
-                                for related_id in related_events[event_id]:
-                                    events_to_remove.add(related_id)
+                position_mapping = position_to_event_ids
             else:
-                for mapping in buffer_state_mappings:
-                    if mapping.get("buffer_state_idx") == buffer_idx:
-                        state_position_mapping = mapping.get("position_mapping", {})
-                        for pos in range(start, end):
-                            pos_str = str(pos)
-                            if pos_str in state_position_mapping:
-                                for event_id_str in state_position_mapping[pos_str]:
-                                    event_id = int(event_id_str)
-                                    events_to_remove.add(event_id)
-                                    
-                                    if event_id in related_events:
-                                        for related_id in related_events[event_id]:
-                                            events_to_remove.add(related_id)
+                position_mapping = buffer_state_mappings[buffer_idx]["position_mapping"]
+            
+            for event_ids in position_mapping[start:end]:
+                for event_id in event_ids:
+                    events_to_remove.add(event_id)
+                    
+                    if event_id in related_events:
+                        for related_id in related_events[event_id]:
+                            events_to_remove.add(related_id)
         
-        event_timestamps = {}
-        event_to_index = {}
-        for i, event in enumerate(events):
-            event_id = id(event)
-            event_timestamps[event_id] = event.get("timestamp", datetime.now().isoformat())
-            event_to_index[event_id] = i
+        fallback_timestamp = datetime.now().isoformat()
+        event_timestamps = [event.get("timestamp", fallback_timestamp) for event in events]
         
-        sanitized_events = [event.copy() for event in events if id(event) not in events_to_remove]
+        sanitized_events = [event for i, event in enumerate(events) if i not in events_to_remove]
         for start, end, buffer_idx in password_locations:
-            timestamp = datetime.now().isoformat()
+            timestamp = fallback_timestamp
             
             if buffer_idx == -1:
                 if 0 <= start < end <= len(extracted_text):
                     last_pos = end - 1
-                    pos_str = str(last_pos)
                     
-                    if pos_str in position_to_event_ids and position_to_event_ids[pos_str]:
-                        event_ids = [int(eid) for eid in position_to_event_ids[pos_str]]
-                        if event_ids:
-                            last_event_id = max(event_ids, 
-                                                key=lambda eid: event_to_index.get(eid, 0) if eid in event_to_index else 0)
-                            if last_event_id in event_timestamps:
-                                timestamp = event_timestamps[last_event_id]
+                    event_ids = position_to_event_ids[last_pos]
+                    if event_ids:
+                        timestamp = event_timestamps[max(event_ids)]
             else:
-                for mapping in buffer_state_mappings:
-                    if mapping.get("buffer_state_idx") == buffer_idx and "event_id" in mapping:
-                        event_id = mapping["event_id"]
-                        if event_id in event_timestamps:
-                            timestamp = event_timestamps[event_id]
+                mapping = buffer_state_mappings[buffer_idx]
+                if "event_id" in mapping:
+                    timestamp = event_timestamps[mapping["event_id"]]
             
             sanitized_events.append({
                 "event": "PASSWORD_FOUND",
@@ -185,7 +190,7 @@ class KeystrokeSanitizer:
             }
             
             with open(output_file, "w") as f:
-                json.dump(output_data, f, indent=2)
+                f.write(json.dumps(output_data, indent=2))
                 
             return True
             
@@ -202,20 +207,14 @@ class KeystrokeSanitizer:
             
         occurrences = {}
         
-        original_passwords = []
-        if custom_strings:
-            original_passwords = self.password_manager.get_passwords()
-            strings_to_add = [custom_strings] if isinstance(custom_strings, str) else custom_strings
-            for string in strings_to_add:
-                self.password_manager.add_password(string, f"Temp: {string[:10]}")
+        passwords = self._passwords_with(custom_strings)
         
         for file_path in log_files:
             try:
-                events = self._extract_events_from_log(file_path)
-                if not events:
+                sanitized_data = self._process_log_file(file_path, passwords)
+                if not sanitized_data:
                     continue
                 
-                sanitized_data = self.process_events(events)
                 if sanitized_data["password_locations"]:
                     filename = os.path.basename(file_path)
                     occurrences[filename] = len(sanitized_data["password_locations"])
@@ -223,12 +222,6 @@ class KeystrokeSanitizer:
             except Exception as e:
                 print(f"Error processing file {file_path}: {e}")
         
-        if custom_strings and original_passwords:
-            for pwd in self.password_manager.get_passwords():
-                self.password_manager.remove_password(pwd)
-            for pwd in original_passwords:
-                self.password_manager.add_password(pwd)
-                
         return occurrences
     
     def sanitize_logs(self, custom_strings=None, logs_dir=None) -> Dict[str, int]:
@@ -240,21 +233,14 @@ class KeystrokeSanitizer:
             
         replacements = {}
         
-        original_passwords = []
-        if custom_strings:
-            original_passwords = self.password_manager.get_passwords()
-            strings_to_add = [custom_strings] if isinstance(custom_strings, str) else custom_strings
-            for string in strings_to_add:
-                self.password_manager.add_password(string, f"Temp: {string[:10]}")
+        passwords = self._passwords_with(custom_strings)
         
         for file_path in log_files:
             try:
-                events = self._extract_events_from_log(file_path)
-                if not events:
+                sanitized_data = self._process_log_file(file_path, passwords)
+                if not sanitized_data:
                     continue
                 
-                sanitized_data = self.process_events(events)
-                
                 if sanitized_data["password_locations"]:
                     self._save_sanitized_data(file_path, sanitized_data)
                     filename = os.path.basename(file_path)
@@ -263,24 +249,38 @@ class KeystrokeSanitizer:
             except Exception as e:
                 print(f"Error sanitizing file {file_path}: {e}")
         
-        if custom_strings and original_passwords:
-            for pwd in self.password_manager.get_passwords():
-                self.password_manager.remove_password(pwd)
-            for pwd in original_passwords:
-                self.password_manager.add_password(pwd)
-                
         return replacements
     
     def _get_log_files(self, logs_dir) -> List[str]:
         if not os.path.exists(logs_dir):
             return []
             
-        return glob.glob(os.path.join(logs_dir, "*.json"))
+        with os.scandir(logs_dir) as entries:
+            return [entry.path for entry in entries
+                    if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file()]
+    
+    def _passwords_with(self, custom_strings=None) -> List[str]:
+        passwords = list(self._current_passwords())
+        if custom_strings:
+            strings_to_add = [custom_strings] if isinstance(custom_strings, str) else custom_strings
+            for string in strings_to_add:
+                if string not in passwords:
+                    passwords.append(string)
+        return passwords
+    
+    def _process_log_file(self, file_path: str, passwords: List[str]) -> Optional[Dict[str, Any]]:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        
+        events = self._extract_events_from_log(file_path, content)
+        if not events:
+            return None
+            
+        return self.process_events(events, passwords)
     
-    def _extract_events_from_log(self, file_path: str) -> List[Dict[str, Any]]:
+    def _extract_events_from_log(self, file_path: str, content: bytes) -> List[Dict[str, Any]]:
         try:
-            with open(file_path, 'r') as f:
-                log_data = json.load(f)
+            log_data = json.loads(content)
                 
             if 'events' in log_data:
                 return log_data['events']
@@ -299,7 +299,7 @@ class KeystrokeSanitizer:
             }
             
             with open(file_path, 'w') as f:
-                json.dump(output_data, f, indent=2)
+                f.write(json.dumps(output_data, indent=2))
                 
             return True
             
@@ -5,9 +5,17 @@ Provides a simple interface to view, add, and delete passwords.
 """
 
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from utils.keepass_manager import KeePassManager
+from pykeepass_gui import KeePassDialog
+
+_MASKED = "********"
+_FONT = ("Helvetica", 10)
+_FONT_BOLD = ("Helvetica", 10, "bold")
+_BUTTON_FONT = ("Helvetica", 12, "bold")
 
 class PasswordViewer:
     """Password viewer dialog"""
@@ -22,9 +30,15 @@ class PasswordViewer:
         else:
             self.keepass_manager = KeePassManager.get_instance(db_path)
             
-        # Password entries
-        self.password_entries = []
+        # Password entries, keyed by table row id
+        self.password_entries = {}
         self.showing_passwords = {}  # Track which passwords are shown
+        self.tree = None  # Password table, present only while entries are listed
+        self._next_row_id = 0  # Table row ids are never reused within a viewer
+        self._save_job = None  # Pending save after deletions
+        self._rendered_version = None  # Manager version the current view shows
+        self._toast_job = None  # Pending hide of the status toast
+        self._unlocking = False  # True while a worker thread is unlocking the database
         
     def show_dialog(self):
         """Show the password viewer dialog"""
@@ -34,65 +48,49 @@ class PasswordViewer:
         self.dialog.geometry("400x400")
         self.dialog.configure(bg="#2C2C2C")
         self.dialog.resizable(False, False)
+        self.dialog.protocol("WM_DELETE_WINDOW", self._close)
+        self.dialog.bind("<Destroy>", self._on_destroy)
         
         # Make dialog modal
         self.dialog.transient(self.parent)
         self.dialog.grab_set()
         
-        
-        # Check if database is locked
-        if not self.keepass_manager.is_unlocked():
-            # Offer to unlock but don't force it
-            if messagebox.askyesno(
-                "Database Locked",
-                "Password database is locked. Would you like to unlock it now?",
-                parent=self.dialog
-            ):
-                # User chose to unlock, prompt for password
-                master_password = simpledialog.askstring(
-                    "Master Password",
-                    "Enter master password to view passwords:",
-                    show='*',
-                    parent=self.dialog
-                )
-                
-                if master_password:
-                    # Try to unlock with the provided password
-                    success = self.keepass_manager.unlock(master_password)
-                    if success:
-                        # Load the passwords if unlocked successfully
-                        self.keepass_manager.load_passwords()
-                    else:
-                        # Show error but don't close dialog
-                        messagebox.showerror(
-                            "Error", 
-                            "Failed to unlock password database. Check your password and try again.",
-                            parent=self.dialog
-                        )
-                # If user cancels password prompt, just continue with locked state
-            # If user doesn't want to unlock, just continue with locked state
+        # Shared by the keyring management buttons
+        self.keepass_dialog = KeePassDialog(self.dialog, self.keepass_manager.passwords_file)
         
         # Create frame for the password list
         self.password_frame = tk.Frame(self.dialog, bg="#2C2C2C")
         self.password_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self._rendered_version = None
+        self._unlocking = False
+        
+        # Transient status message shown over the bottom of the list
+        self.toast_label = tk.Label(
+            self.dialog,
+            font=_FONT,
+            fg="white",
+            bg="#444444",
+            padx=10,
+            pady=4
+        )
         
         # Create buttons
         button_frame = tk.Frame(self.dialog, bg="#2C2C2C")
         button_frame.pack(fill="x", padx=10, pady=(0, 10))
         
-        add_button = tk.Button(
+        self.add_button = tk.Button(
             button_frame,
             text="Add Password",
-            font=("Helvetica", 12, "bold"),
+            font=_BUTTON_FONT,
             command=self.add_password
         )
-        add_button.pack(side="left", padx=5, pady=5, fill="x", expand=True)
+        self.add_button.pack(side="left", padx=5, pady=5, fill="x", expand=True)
         
         close_button = tk.Button(
             button_frame,
             text="Close",
-            font=("Helvetica", 12, "bold"),
-            command=self.dialog.destroy
+            font=_BUTTON_FONT,
+            command=self._close
         )
         close_button.pack(side="left", padx=5, pady=5, fill="x", expand=True)
         
@@ -104,53 +102,140 @@ class PasswordViewer:
         self.change_pw_button = tk.Button(
             db_frame,
             text="Change Keyring Password",
-            font=("Helvetica", 12, "bold"),
+            font=_BUTTON_FONT,
             command=self._change_master_password
         )
         self.change_pw_button.pack(side="left", padx=5, pady=5, fill="x", expand=True)
         
-        # Create new keyring button - always enabled
-        new_keyring_button = tk.Button(
+        # Create new keyring button - enabled unless an unlock is in progress
+        self.new_keyring_button = tk.Button(
             db_frame,
             text="Create New Keyring",
-            font=("Helvetica", 12, "bold"),
+            font=_BUTTON_FONT,
             command=self._create_new_keyring
         )
-        new_keyring_button.pack(side="left", padx=5, pady=5, fill="x", expand=True)
+        self.new_keyring_button.pack(side="left", padx=5, pady=5, fill="x", expand=True)
         
         # Update button states based on lock state
         self._update_button_states()
         
-        # Load and display passwords
+        # Load and display passwords, or offer to unlock if the database is locked
         self.load_passwords()
         
         # Wait for dialog to close
         self.parent.wait_window(self.dialog)
     
+    def _submit_unlock(self, event=None):
+        """Unlock with the password typed into the locked panel"""
+        master_password = self.unlock_entry.get()
+        if master_password:
+            self._start_unlock(master_password)
+    
+    def _start_unlock(self, master_password):
+        """Unlock the database on a worker thread so the key derivation doesn't freeze the dialog"""
+        for widget in self.password_frame.winfo_children():
+            widget.destroy()
+        self._rendered_version = None
+        
+        # Everything that could touch the database waits for the unlock
+        self._unlocking = True
+        self._update_button_states()
+            
+        tk.Label(
+            self.password_frame,
+            text="Unlocking password database...",
+            font=_FONT,
+            fg="white",
+            bg="#2C2C2C"
+        ).pack(pady=(50, 10))
+        
+        progress = ttk.Progressbar(self.password_frame, mode="indeterminate", length=200)
+        progress.pack()
+        progress.start(10)
+        
+        # Tk may only be used from this thread, so the worker reports through a queue
+        results = queue.Queue()
+        threading.Thread(target=self._do_unlock, args=(master_password, results), daemon=True).start()
+        self.dialog.after(100, self._poll_unlock, results)
+    
+    def _do_unlock(self, master_password, results):
+        """Unlock on the worker thread and queue the result"""
+        results.put(self.keepass_manager.unlock(master_password))
+    
+    def _poll_unlock(self, results):
+        """Wait for the worker's result without blocking the event loop"""
+        if not self.dialog.winfo_exists():
+            return
+            
+        try:
+            success = results.get_nowait()
+        except queue.Empty:
+            self.dialog.after(100, self._poll_unlock, results)
+            return
+            
+        self._on_unlock_done(success)
+    
+    def _on_unlock_done(self, success):
+        """Show the unlock result"""
+        self._unlocking = False
+        self._update_button_states()
+        self.load_passwords()
+        
+        if not success:
+            # Show error in the unlock panel
+            self.unlock_error_label.config(text="Failed to unlock. Check your password and try again.")
+    
     def load_passwords(self):
         """Load and display passwords from the database"""
+        # Nothing to rebuild if the database hasn't changed since the view was built
+        if self._rendered_version == self.keepass_manager.version:
+            return
+        self._rendered_version = self.keepass_manager.version
+        
         # Clear existing entries
         for widget in self.password_frame.winfo_children():
             widget.destroy()
         
         # Reset tracking
-        self.password_entries = []
+        self.password_entries = {}
         self.showing_passwords = {}
+        self.tree = None
         
         # Update button states
         self._update_button_states()
         
         # Check if locked
         if not self.keepass_manager.is_unlocked():
-            # Show locked message
+            # Show locked message with an unlock prompt
             label = tk.Label(
                 self.password_frame,
                 text="Password database is locked",
-                font=("Helvetica", 10),
+                font=_FONT,
                 fg="white",
                 bg="#2C2C2C"
             )
-            label.pack(pady=50)
+            label.pack(pady=(50, 10))
+            
+            self.unlock_entry = tk.Entry(self.password_frame, show="*", font=_FONT, width=25)
+            self.unlock_entry.pack(pady=5)
+            self.unlock_entry.bind("<Return>", self._submit_unlock)
+            self.unlock_entry.focus_set()
+            
+            tk.Button(
+                self.password_frame,
+                text="Unlock",
+                font=_FONT_BOLD,
+                command=self._submit_unlock
+            ).pack(pady=5)
+            
+            self.unlock_error_label = tk.Label(
+                self.password_frame,
+                text="",
+                font=_FONT,
+                fg="#FF6B6B",
+                bg="#2C2C2C"
+            )
+            self.unlock_error_label.pack(pady=5)
             return
             
         # Get passwords from the database
@@ -160,148 +245,108 @@ class PasswordViewer:
             label = tk.Label(
                 self.password_frame,
                 text="No passwords found in the database",
-                font=("Helvetica", 10),
+                font=_FONT,
                 fg="white",
                 bg="#2C2C2C"
             )
             label.pack(pady=50)
             return
         
-        # Create header
-        header_frame = tk.Frame(self.password_frame, bg="#2C2C2C")
-        header_frame.pack(fill="x", pady=(0, 5))
-        
-        tk.Label(
-            header_frame,
-            text="Title",
-            font=("Helvetica", 10, "bold"),
-            fg="white",
-            bg="#2C2C2C",
-            width=20,
-            anchor="w"
-        ).pack(side="left", padx=5)
-        
-        tk.Label(
-            header_frame,
-            text="Password",
-            font=("Helvetica", 10, "bold"),
-            fg="white",
-            bg="#2C2C2C",
-            width=20,
-            anchor="w"
-        ).pack(side="left", padx=5)
-        
-        tk.Label(
-            header_frame,
-            text="Show",
-            font=("Helvetica", 10, "bold"),
-            fg="white",
-            bg="#2C2C2C",
-            width=5,
-            anchor="w"
-        ).pack(side="left", padx=5)
-        
-        tk.Label(
-            header_frame,
-            text="Delete",
-            font=("Helvetica", 10, "bold"),
-            fg="white",
-            bg="#2C2C2C",
-            width=5,
-            anchor="w"
-        ).pack(side="left", padx=5)
-        
-        # Create scrollable container
-        canvas = tk.Canvas(self.password_frame, bg="#2C2C2C", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self.password_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="#2C2C2C")
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        # Style the table to match the dark dialog
+        style = ttk.Style(self.dialog)
+        style.configure(
+            "Passwords.Treeview",
+            background="#333333",
+            fieldbackground="#2C2C2C",
+            foreground="white",
+            font=_FONT,
+            rowheight=26
         )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side="left", fill="both", expand=True)
+        style.configure(
+            "Passwords.Treeview.Heading",
+            background="#2C2C2C",
+            foreground="white",
+            font=_FONT_BOLD
+        )
+        style.map("Passwords.Treeview", background=[("selected", "#444444")])
+        
+        # One table holds every row, so no widgets are created per password
+        self.tree = ttk.Treeview(
+            self.password_frame,
+            columns=("title", "password", "show", "delete"),
+            show="headings",
+            selectmode="none",
+            style="Passwords.Treeview"
+        )
+        self.tree.heading("title", text="Title", anchor="w")
+        self.tree.heading("password", text="Password", anchor="w")
+        self.tree.heading("show", text="Show")
+        self.tree.heading("delete", text="Delete")
+        self.tree.column("title", width=140, anchor="w")
+        self.tree.column("password", width=140, anchor="w")
+        self.tree.column("show", width=50, anchor="center", stretch=False)
+        self.tree.column("delete", width=50, anchor="center", stretch=False)
+        
+        scrollbar = ttk.Scrollbar(self.password_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        
+        self.tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
+        # Show and Delete cells are handled by a single click binding
+        self.tree.bind("<Button-1>", self._on_tree_click)
+        
         # Add password entries
-        for i, entry in enumerate(password_entries):
-            entry_id = id(entry)
-            self.showing_passwords[entry_id] = False
-            
-            entry_frame = tk.Frame(scrollable_frame, bg="#333333")
-            entry_frame.pack(fill="x", pady=1)
-            
-            # Title
-            title_label = tk.Label(
-                entry_frame,
-                text=entry.title or f"Password {i+1}",
-                font=("Helvetica", 10),
-                fg="white",
-                bg="#333333",
-                width=20,
-                anchor="w"
-            )
-            title_label.pack(side="left", padx=5, pady=5)
-            
-            # Password (masked by default)
-            password_label = tk.Label(
-                entry_frame,
-                text="*" * 8,
-                font=("Helvetica", 10),
-                fg="white",
-                bg="#333333",
-                width=20,
-                anchor="w"
-            )
-            password_label.pack(side="left", padx=5, pady=5)
-            
-            # Show/hide checkbox
-            show_var = tk.BooleanVar(value=False)
-            show_checkbox = tk.Checkbutton(
-                entry_frame,
-                variable=show_var,
-                bg="#333333",
-                activebackground="#444444",
-                fg="white",
-                selectcolor="#222222",  # Darker color when selected for better contrast
-                highlightthickness=0,   # Remove highlight border
-                command=lambda e=entry, pl=password_label, sv=show_var, eid=entry_id: self.toggle_password(e, pl, sv, eid)
-            )
-            show_checkbox.pack(side="left", padx=5, pady=5)
-            
-            # Delete button
-            delete_button = tk.Button(
-                entry_frame,
-                text="X",
-                font=("Helvetica", 8, "bold"),
-                width=2,
-                command=lambda e=entry, ef=entry_frame: self.delete_password(e, ef)
-            )
-            delete_button.pack(side="left", padx=5, pady=5)
+        for entry in password_entries:
+            self._append_row(entry)
+    
+    def _append_row(self, entry):
+        """Add a table row for a database entry"""
+        entry_id = f"row{self._next_row_id}"
+        self._next_row_id += 1
+        title = entry.title or f"Password {len(self.password_entries) + 1}"
+        self.showing_passwords[entry_id] = False
+        self.password_entries[entry_id] = {"title": title, "password": entry.password}
+        
+        self.tree.insert(
+            "",
+            "end",
+            iid=entry_id,
+            values=(title, _MASKED, "\u2610", "X")
+        )
+    
+    def _remove_row(self, entry_id):
+        """Remove a table row"""
+        self.tree.delete(entry_id)
+        del self.password_entries[entry_id]
+        del self.showing_passwords[entry_id]
+    
+    def _on_tree_click(self, event):
+        """Dispatch clicks on the Show and Delete cells"""
+        entry_id = self.tree.identify_row(event.y)
+        if not entry_id:
+            return
             
-            self.password_entries.append({
-                "entry": entry,
-                "frame": entry_frame,
-                "password_label": password_label,
-                "show_var": show_var
-            })
+        column = self.tree.identify_column(event.x)
+        if column == "#3":
+            self.toggle_password(entry_id)
+        elif column == "#4":
+            self.delete_password(entry_id)
     
-    def toggle_password(self, entry, label, show_var, entry_id):
+    def toggle_password(self, entry_id):
         """Toggle password visibility"""
-        if show_var.get():
+        if not self.showing_passwords[entry_id]:
             # Show password
-            label.config(text=entry.password)
+            self.tree.set(entry_id, "password", self.password_entries[entry_id]["password"])
+            self.tree.set(entry_id, "show", "\u2611")
             self.showing_passwords[entry_id] = True
         else:
             # Hide password
-            label.config(text="*" * 8)
+            self.tree.set(entry_id, "password", _MASKED)
+            self.tree.set(entry_id, "show", "\u2610")
             self.showing_passwords[entry_id] = False
     
-    def delete_password(self, entry, entry_frame):
+    def delete_password(self, entry_id):
         """Delete a password with confirmation"""
         # Check if database is locked
         if not self.keepass_manager.is_unlocked():
@@ -312,7 +357,8 @@ class PasswordViewer:
             )
             return
             
-        title = entry.title or "this password"
+        row = self.password_entries[entry_id]
+        title = row["title"]
         confirm = messagebox.askyesno(
             "Confirm Deletion",
             f"Are you sure you want to delete {title}?",
@@ -323,8 +369,8 @@ class PasswordViewer:
             # Delete from the database
             try:
                 # Use our remove_password method that checks lock state
-                password = entry.password
-                success = self.keepass_manager.remove_password(password)
+                password = row["password"]
+                success = self.keepass_manager.remove_password(password, save=False)
                 
                 if not success:
                     messagebox.showerror(
@@ -333,23 +379,24 @@ class PasswordViewer:
                         parent=self.dialog
                     )
                     return
+                    
+                # Deleting several passwords in a row only writes the database once
+                if self._save_job is not None:
+                    self.dialog.after_cancel(self._save_job)
+                self._save_job = self.dialog.after(500, self._flush_save)
                 
-                # Remove from the UI
-                entry_frame.destroy()
-                
-                # Check if we need to update the UI
-                entries = []
-                if self.keepass_manager.is_unlocked() and hasattr(self.keepass_manager, 'kp') and self.keepass_manager.kp:
-                    entries = self.keepass_manager.kp.entries
+                # Remove from the UI every row that held this password
+                removed_ids = [row_id for row_id, other in self.password_entries.items()
+                               if other["password"] == password]
+                for row_id in removed_ids:
+                    self._remove_row(row_id)
                     
-                if not entries:
+                if not self.password_entries:
                     self.load_passwords()  # Reload to show "No passwords" message
+                else:
+                    self._rendered_version = self.keepass_manager.version
                     
-                messagebox.showinfo(
-                    "Success",
-                    f"Password {title} deleted successfully",
-                    parent=self.dialog
-                )
+                self._toast(f"Password {title} deleted successfully")
                 
             except Exception as e:
                 messagebox.showerror(
@@ -358,6 +405,42 @@ class PasswordViewer:
                     parent=self.dialog
                 )
     
+    def _toast(self, text, ms=1500):
+        """Briefly show a status message without blocking the dialog"""
+        self.toast_label.config(text=text)
+        self.toast_label.place(in_=self.password_frame, relx=0.5, rely=1.0, anchor="s")
+        self.toast_label.lift()
+        
+        if self._toast_job is not None:
+            self.dialog.after_cancel(self._toast_job)
+        self._toast_job = self.dialog.after(ms, self.toast_label.place_forget)
+    
+    def _flush_save(self):
+        """Save deletions that are still pending"""
+        if self._save_job is None:
+            return
+            
+        self.dialog.after_cancel(self._save_job)
+        self._save_job = None
+        if not self.keepass_manager.save_passwords():
+            messagebox.showerror(
+                "Error",
+                "Failed to save the password database.",
+                parent=self.dialog
+            )
+    
+    def _close(self):
+        """Save pending deletions and close the dialog"""
+        self._flush_save()
+        self.dialog.destroy()
+    
+    def _on_destroy(self, event):
+        """Save pending deletions however the dialog goes away, e.g. with its parent"""
+        # The pending after() job is deleted along with the dialog, so it would never run
+        if event.widget is self.dialog and self._save_job is not None:
+            self._save_job = None
+            self.keepass_manager.save_passwords()
+    
     def add_password(self):
         """Add a new password"""
         # Check if database is locked
@@ -402,16 +485,20 @@ class PasswordViewer:
         
         try:
             # Add to the database
+            version = self.keepass_manager.version
             self.keepass_manager.add_password(password, title=title)
             
-            # Reload the password list
-            self.load_passwords()
+            # Add just the new row when the table is showing, otherwise reload
+            if self.tree is not None:
+                if self.keepass_manager.version != version:
+                    entry = self.keepass_manager.kp.find_entries(password=password, first=True)
+                    if entry:
+                        self._append_row(entry)
+                self._rendered_version = self.keepass_manager.version
+            else:
+                self.load_passwords()
             
-            messagebox.showinfo(
-                "Success",
-                "Password added successfully",
-                parent=self.dialog
-            )
+            self._toast("Password added successfully")
             
         except Exception as e:
             messagebox.showerror(
@@ -424,8 +511,13 @@ class PasswordViewer:
         """Update button states based on lock status"""
         is_unlocked = self.keepass_manager.is_unlocked()
         
+        # Adding or creating a keyring would contend with an unlock in progress
+        busy_state = "disabled" if self._unlocking else "normal"
+        self.add_button.config(state=busy_state)
+        self.new_keyring_button.config(state=busy_state)
+        
         # Change password button - only enabled if unlocked
-        if is_unlocked:
+        if is_unlocked and not self._unlocking:
             self.change_pw_button.config(state="normal")
         else:
             self.change_pw_button.config(state="disabled")
@@ -442,9 +534,8 @@ class PasswordViewer:
             )
             return
             
-        from pykeepass_gui import KeePassDialog
-        dialog = KeePassDialog(self.dialog, self.keepass_manager.passwords_file)
-        result = dialog.change_master_password()
+        self._flush_save()
+        result = self.keepass_dialog.change_master_password()
         
         # Refresh the password list after changing master password
         if result:
@@ -452,9 +543,8 @@ class PasswordViewer:
     
     def _create_new_keyring(self):
         """Delegate to KeePassDialog's create new keyring method"""
-        from pykeepass_gui import KeePassDialog
-        dialog = KeePassDialog(self.dialog, self.keepass_manager.passwords_file)
-        result = dialog.create_new_keyring()
+        self._flush_save()
+        result = self.keepass_dialog.create_new_keyring()
         
         # Refresh the password list after creating new keyring
         if result:
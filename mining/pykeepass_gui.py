@@ -116,11 +116,9 @@ class KeePassDialog:
             if password is None:  # User cancelled
                 return False
                 
-            if self.keepass_manager.check_credentials(password):
-                # Password is correct - use unlock instead of setup_encryption
-                if self.keepass_manager.unlock(password):
-                    self.keepass_manager.load_passwords()
-                    return True
+            if self.keepass_manager.unlock(password):
+                self.keepass_manager.load_passwords()
+                return True
             else:
                 attempts_left = attempts - i - 1
                 if attempts_left > 0:
@@ -36,7 +36,6 @@ class SimpleCollector:
         """Add a password to sanitize"""
         result = self.keystroke_sanitizer.add_password(password)
         if result:
-            self.keystroke_sanitizer.save_passwords()
             print("Added password to sanitization list")
         return result
     
@@ -8,6 +8,7 @@ A simplified test suite for the KeystrokeSanitizer module.
 
 import os
 import time
+import tempfile
 import unittest
 import json
 from datetime import datetime
@@ -363,6 +364,25 @@ class TestKeystrokeSanitizer(unittest.TestCase):
             
         print("\nAll sanitizer test cases passed successfully")
 
+    def test_find_occurrences_custom_strings(self):
+        """Custom strings are searched in log files without being added to the database"""
+        passwords_before = self.sanitizer.password_manager.get_passwords()
+        
+        events = []
+        for char in "token hunter2xyz then done":
+            events.append({"event": "KEY_PRESS", "key": char, "timestamp": datetime.now().isoformat()})
+            events.append({"event": "KEY_RELEASE", "key": char, "timestamp": datetime.now().isoformat()})
+        
+        with tempfile.TemporaryDirectory() as logs_dir:
+            with open(os.path.join(logs_dir, "session.json"), "w") as f:
+                json.dump({"events": events}, f)
+                
+            occurrences = self.sanitizer.find_occurrences(custom_strings="hunter2xyz", logs_dir=logs_dir)
+        
+        self.assertEqual(occurrences, {"session.json": 1})
+        self.assertEqual(self.sanitizer.password_manager.get_passwords(), passwords_before)
+        self.assertNotIn("hunter2xyz", passwords_before)
+
 
 if __name__ == "__main__":
     print("Please use the run_tests.py script to run tests.")
@@ -3,6 +3,7 @@ Fuzzy matching utility for password detection.
 Provides core methods for finding password matches in text.
 """
 
+from bisect import bisect_left
 from difflib import SequenceMatcher
 from dataclasses import dataclass
 from typing import List, Tuple, Set
@@ -64,22 +65,30 @@ class FuzzyMatcher:
         # Sort by similarity (highest first)
         sorted_matches = sorted(matches, key=lambda x: x.similarity, reverse=True)
         
-        # Filter overlapping matches (keep higher similarity ones)
+        # Filter overlapping matches (keep higher similarity ones).
+        # Kept matches never overlap, so sorted by start they are also sorted by end
+        # and only the last one starting before a match's end can overlap it.
         filtered_matches = []
+        kept_starts = []
         for match in sorted_matches:
-            overlap = False
-            for existing in filtered_matches:
-                if (match.start < existing.end and match.end > existing.start):
-                    overlap = True
-                    break
+            idx = bisect_left(kept_starts, match.end)
+            if idx > 0 and filtered_matches[idx - 1].end > match.start:
+                continue
             
-            if not overlap:
-                filtered_matches.append(match)
+            kept_starts.insert(idx, match.start)
+            filtered_matches.insert(idx, match)
                 
-        # Re-sort by position for consistency
-        filtered_matches.sort(key=lambda x: x.start)
         return filtered_matches
     
+    @staticmethod
+    def _trim_whitespace(text: str, start: int, end: int) -> Tuple[int, int]:
+        """Shrink a span so it does not start or end with whitespace"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end-1].isspace():
+            end -= 1
+        return start, end
+    
     @classmethod
     def find_matches(cls, text: str, passwords: List[str], min_similarity: float = 0.80) -> List[Match]:
         """
@@ -100,44 +109,118 @@ class FuzzyMatcher:
         if not text or not passwords:
             return []
         
-        # Process each password
-        for password in passwords:
+        text_len = len(text)
+        
+        # Passwords of the same length share window sizes, so each chunk is
+        # sliced and lowercased once per length instead of once per password
+        cohorts = {}
+        for idx, password in enumerate(passwords):
+            length = len(password)
             # Skip very short passwords for fuzzy matching
-            if len(password) < 4:
+            if length < 4:
                 continue
-                
+            cohorts.setdefault(length, []).append((idx, password, password.lower()))
+        
+        # Matches are collected per password so their order matches a per-password scan
+        matches_by_password = [[] for _ in passwords]
+        
+        # Literal occurrences always score 1.0, so they are found with str.find first.
+        # Slicing the lowercased text only matches lowercasing each chunk for ASCII text.
+        find_exact = text.isascii()
+        isolated_hits = []
+        if find_exact:
+            text_lower = text.lower()
+            exact_spans = []
+            for length, cohort in cohorts.items():
+                for idx, password, password_lower in cohort:
+                    i = text_lower.find(password_lower)
+                    while i != -1:
+                        start, end = cls._trim_whitespace(text, i, i + length)
+                        if start < end:
+                            matches_by_password[idx].append(Match(
+                                start=start,
+                                end=end,
+                                password=password,
+                                similarity=1.0,
+                                source="exact"
+                            ))
+                            exact_spans.append((start, end))
+                        i = text_lower.find(password_lower, i + 1)
+            
+            # A hit that overlaps no other literal hit always survives overlap removal,
+            # so no other window touching it can end up in the result
+            exact_spans.sort()
+            span_count = len(exact_spans)
+            furthest_end = 0
+            for k, (start, end) in enumerate(exact_spans):
+                overlaps_previous = furthest_end > start
+                overlaps_next = k + 1 < span_count and exact_spans[k + 1][0] < end
+                if not overlaps_previous and not overlaps_next:
+                    isolated_hits.append((start, end))
+                furthest_end = max(furthest_end, end)
+        
+        # For each position, the start of the first isolated hit ending after it, so a
+        # window overlaps a hit exactly when that start falls before the window's end
+        next_hit_start = []
+        if isolated_hits:
+            hit_count = len(isolated_hits)
+            k = 0
+            for i in range(text_len):
+                while k < hit_count and isolated_hits[k][1] <= i:
+                    k += 1
+                next_hit_start.append(isolated_hits[k][0] if k < hit_count else text_len)
+        
+        # SequenceMatcher indexes its second sequence, so each chunk is indexed once
+        # and compared against every password in its cohort
+        matcher = SequenceMatcher(None)
+        
+        for length, cohort in cohorts.items():
             # Try different window sizes based on password length
-            min_window = max(len(password) - 2, 4)
-            max_window = min(len(password) + 4, len(text))
+            min_window = max(length - 2, 4)
+            max_window = min(length + 4, text_len)
             
             for window_size in range(min_window, max_window + 1):
                 # Slide window through text
-                for i in range(len(text) - window_size + 1):
-                    chunk = text[i:i + window_size]
+                for i in range(text_len - window_size + 1):
+                    window_end = i + window_size
+                    if next_hit_start and next_hit_start[i] < window_end:
+                        continue
                     
-                    # Check similarity (case insensitive)
-                    similarity = cls.calculate_similarity(password, chunk)
+                    chunk_lower = text[i:window_end].lower()
+                    matcher.set_seq2(chunk_lower)
                     
-                    # Is this a good match?
-                    if similarity >= min_similarity:
-                        # Determine the match type
-                        source = "exact" if similarity >= 0.99 else "fuzzy"
-                        
-                        # Trim leading/trailing whitespace
-                        start, end = i, i + window_size
-                        while start < end and text[start].isspace():
-                            start += 1
-                        while end > start and text[end-1].isspace():
-                            end -= 1
+                    for idx, password, password_lower in cohort:
+                        # Check similarity (case insensitive)
+                        if password_lower == chunk_lower:
+                            if find_exact:
+                                continue  # Already added as a literal hit
+                            similarity = 1.0
+                        else:
+                            matcher.set_seq1(password_lower)
+                            # Length and shared-character upper bounds rule out most windows cheaply
+                            if matcher.real_quick_ratio() < min_similarity or matcher.quick_ratio() < min_similarity:
+                                continue
+                            similarity = matcher.ratio()
                         
-                        if start < end:  # Only add if we have a non-whitespace match
-                            all_matches.append(Match(
-                                start=start,
-                                end=end,
-                                password=password,
-                                similarity=similarity,
-                                source=source
-                            ))
+                        # Is this a good match?
+                        if similarity >= min_similarity:
+                            # Determine the match type
+                            source = "exact" if similarity >= 0.99 else "fuzzy"
+                            
+                            # Trim leading/trailing whitespace
+                            start, end = cls._trim_whitespace(text, i, window_end)
+                            
+                            if start < end:  # Only add if we have a non-whitespace match
+                                matches_by_password[idx].append(Match(
+                                    start=start,
+                                    end=end,
+                                    password=password,
+                                    similarity=similarity,
+                                    source=source
+                                ))
+        
+        for matches in matches_by_password:
+            all_matches.extend(matches)
         
         # Remove overlapping matches
         return cls.remove_overlapping_matches(all_matches)
@@ -36,8 +36,11 @@ class KeePassManager:
             self.passwords_file = passwords_file
             self.kp = None
             self.passwords = []
+            self._password_set = set()  # Mirrors self.passwords for duplicate checks
             self.is_initialized = False
             self.is_locked = True  # Start in locked state
+            self.version = 0  # Bumped whenever the database or its entries change
+            self._transformed_key = None  # Derived master key, reused so saves skip the KDF
             
             # Make this the singleton instance if it's the first creation
             if KeePassManager._instance is None:
@@ -49,22 +52,32 @@ class KeePassManager:
             try:
                 if not password:
                     raise ValueError("Password is required")
+                
+                # Reopening with the credentials already in use would only repeat the KDF
+                if (self.is_unlocked() and self.kp and os.path.exists(self.passwords_file)
+                        and self.kp.password == password and self.kp.keyfile == keyfile):
+                    return True
                     
                 if os.path.exists(self.passwords_file):
                     # Open existing database
                     self.kp = PyKeePass(self.passwords_file, password=password, keyfile=keyfile)
+                    self._transformed_key = self.kp.transformed_key
                 else:
                     # Create new database
                     self.kp = create_database(self.passwords_file, password=password, keyfile=keyfile)
+                    self._transformed_key = None
                     self.kp.save()
                 
+                self._refresh_passwords()
                 self.is_initialized = True
                 self.is_locked = False  # Unlock the database
+                self.version += 1
                 return True
             except Exception as e:
                 print(f"Error setting up encryption: {e}")
                 self.is_initialized = False
                 self.is_locked = True
+                self.version += 1
                 return False
                 
     def unlock(self, password=None, keyfile=None) -> bool:
@@ -80,12 +93,16 @@ class KeePassManager:
             try:
                 # Try to open the database
                 self.kp = PyKeePass(self.passwords_file, password=password, keyfile=keyfile)
+                self._transformed_key = self.kp.transformed_key
+                self._refresh_passwords()
                 self.is_initialized = True
                 self.is_locked = False
+                self.version += 1
                 return True
             except Exception as e:
                 print(f"Error unlocking database: {e}")
                 self.is_locked = True
+                self.version += 1
                 return False
                 
     def is_unlocked(self) -> bool:
@@ -104,7 +121,7 @@ class KeePassManager:
                     print("Database is locked or not initialized.")
                     return False
                     
-                self.passwords = self._extract_passwords()
+                self._refresh_passwords()
                 return True
             except Exception as e:
                 print(f"Error loading passwords: {e}")
@@ -118,7 +135,7 @@ class KeePassManager:
                     print("Database is locked or not initialized.")
                     return False
                     
-                self.kp.save()
+                self._save()
                 return True
             except Exception as e:
                 print(f"Error saving passwords: {e}")
@@ -143,7 +160,7 @@ class KeePassManager:
                 
             try:
                 # Skip if password already exists
-                if password in self._extract_passwords():
+                if password in self._password_set:
                     return True
                     
                 # Generate a title if not provided
@@ -155,18 +172,20 @@ class KeePassManager:
                 root_group = self.kp.root_group
                 self.kp.add_entry(root_group, title, username or "", password)
                 
-                # Save the database
-                self.kp.save()
-                
-                # Update the passwords list
-                self.passwords = self._extract_passwords()
+                try:
+                    # Save the database
+                    self._save()
+                finally:
+                    # Update the passwords list, which changed in memory even if saving failed
+                    self._refresh_passwords()
+                    self.version += 1
                 return True
             except Exception as e:
                 print(f"Error adding password: {e}")
                 return False
     
-    def remove_password(self, password: str) -> bool:
-        """Remove a password from the KeePass database"""
+    def remove_password(self, password: str, save: bool = True) -> bool:
+        """Remove a password from the KeePass database, leaving the save to save_passwords() if save is False"""
         with self._lock:
             if self.is_locked or not self.is_initialized or not self.kp:
                 print("Database is locked or not initialized.")
@@ -186,26 +205,37 @@ class KeePassManager:
                 for entry in entries_to_remove:
                     self.kp.delete_entry(entry)
                     
-                # Save the database
-                self.kp.save()
-                
-                # Update the passwords list
-                self.passwords = self._extract_passwords()
+                try:
+                    # Save the database
+                    if save:
+                        self._save()
+                finally:
+                    # Update the passwords list, which changed in memory even if saving failed
+                    self._refresh_passwords()
+                    self.version += 1
                 return True
             except Exception as e:
                 print(f"Error removing password: {e}")
                 return False
     
+    def _save(self):
+        """Save the database, reusing the derived key when one is known"""
+        self.kp.save(transformed_key=self._transformed_key)
+    
     def get_passwords(self) -> List[str]:
         """Get a copy of the password list"""
         with self._lock:
             if self.is_locked or not self.kp:
                 return []
                 
-            # Refresh the passwords list
-            self.passwords = self._extract_passwords()
+            # The list is refreshed whenever the database is opened or changed
             return self.passwords.copy()
     
+    def _refresh_passwords(self):
+        """Re-read the password list and its lookup set from the database"""
+        self.passwords = self._extract_passwords()
+        self._password_set = set(self.passwords)
+    
     def _extract_passwords(self) -> List[str]:
         """Extract passwords from the KeePass database"""
         if not self.kp:
@@ -262,8 +292,11 @@ class KeePassManager:
                 
                 # Update our instance to use the new credentials
                 self.kp = temp_kp
+                self._transformed_key = None
+                self._refresh_passwords()
                 self.is_initialized = True
                 self.is_locked = False
+                self.version += 1
                 
                 return True
             except Exception as e:
@@ -294,11 +327,13 @@ class KeePassManager:
                 
                 # Update our instance
                 self.kp = new_kp
+                self._transformed_key = None
                 self.is_initialized = True
                 self.is_locked = False
                 
                 # Update the passwords list
-                self.passwords = self._extract_passwords()
+                self._refresh_passwords()
+                self.version += 1
                 
                 return True
             except Exception as e: